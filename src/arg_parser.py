@@ -1,45 +1,63 @@
 """Command line interface for the most active cookie finder."""
 
 import argparse
+import errno
+import os
+import stat
 from datetime import datetime
-from pathlib import Path
 from typing import Optional
 
 
 class ArgumentParser:
     """Command line argument parser for the cookie finder application."""
 
+    # Shared across all instances, built on first use by _build_parser
+    _parser: Optional[argparse.ArgumentParser] = None
+
     def __init__(self) -> None:
         """Initialize the argument parser with all required arguments."""
-        self.parser = argparse.ArgumentParser(
+        self.parser = self._build_parser()
+
+    @classmethod
+    def _build_parser(cls) -> argparse.ArgumentParser:
+        """Build the argparse parser once and reuse it afterwards.
+
+        Returns:
+            Parser with all command line arguments set up
+        """
+        if cls._parser is not None:
+            return cls._parser
+
+        parser = argparse.ArgumentParser(
             description="Find the most active cookie for a specific date",
             epilog="Example: %(prog)s -f cookie_log.csv -d 2018-12-09",
         )
-        self._setup_arguments()
 
-    def _setup_arguments(self) -> None:
-        """Setup all command line arguments."""
-        self.parser.add_argument(
+        parser.add_argument(
             "-f",
             "--filename",
-            type=self.validate_file_exists,
+            type=cls.validate_file_exists,
             required=True,
             help="Path to the cookie log CSV file",
         )
 
-        self.parser.add_argument(
+        parser.add_argument(
             "-d",
             "--date",
-            type=self.validate_date_format,
+            type=cls.validate_date_format,
             required=True,
             help="Target date in YYYY-MM-DD format",
         )
 
-        self.parser.add_argument(
+        parser.add_argument(
             "--verbose", "-v", action="store_true", help="Enable verbose output"
         )
 
-    def validate_date_format(self, date_string: str) -> str:
+        cls._parser = parser
+        return parser
+
+    @staticmethod
+    def validate_date_format(date_string: str) -> str:
         """Validate that the date string is in YYYY-MM-DD format.
 
         Args:
@@ -59,7 +77,8 @@ class ArgumentParser:
                 f"Invalid date format: {date_string}. Expected YYYY-MM-DD"
             )
 
-    def validate_file_exists(self, file_path: str) -> str:
+    @staticmethod
+    def validate_file_exists(file_path: str) -> str:
         """Validate that the file exists and is readable.
 
         Args:
@@ -71,12 +90,20 @@ class ArgumentParser:
         Raises:
             argparse.ArgumentTypeError: If file doesn't exist or isn't readable
         """
-        path = Path(file_path)
-        if not path.exists():
+        # A single stat call answers all three checks. A missing file, a file
+        # used as a directory and a symlink loop all mean there is no file at
+        # that path; any other error, e.g. a permission error, is raised as is
+        try:
+            st = os.stat(file_path)
+        except (FileNotFoundError, NotADirectoryError):
+            raise argparse.ArgumentTypeError(f"File not found: {file_path}")
+        except OSError as e:
+            if e.errno != errno.ELOOP:
+                raise
             raise argparse.ArgumentTypeError(f"File not found: {file_path}")
-        if not path.is_file():
+        if not stat.S_ISREG(st.st_mode):
             raise argparse.ArgumentTypeError(f"Path is not a file: {file_path}")
-        if not path.stat().st_size > 0:
+        if st.st_size == 0:
             raise argparse.ArgumentTypeError(f"File is empty: {file_path}")
 
         return file_path
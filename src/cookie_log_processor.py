@@ -1,13 +1,19 @@
 """Core logic for processing cookie log files and finding most active cookies."""
 
-import csv
-from collections import defaultdict
+import mmap
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Iterator, List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple, TypeVar, Union
 
 from logging_config import get_logger  # type: ignore
 
+# Cookie names are counted as raw bytes and only decoded for the result
+CookieName = TypeVar("CookieName", bytes, str)
+
 
 class CookieLogProcessor:
     """Processes cookie log files to find the most active cookie for a given date."""
@@ -15,6 +21,21 @@ class CookieLogProcessor:
     # Class variable - shared across all instances
     logger = get_logger(__name__)
 
+    # Number of bytes read from the log file per system call
+    READ_BLOCK_SIZE = 1 << 20
+
+    # Files larger than this are counted in bulk by _count_cookies_mapped
+    BULK_COUNT_THRESHOLD = 10 * 1024 * 1024
+
+    # Target date blocks larger than this are counted by several processes
+    PARALLEL_THRESHOLD = 64 * 1024 * 1024
+
+    # Regular expression pieces describing a row the bulk counting path can
+    # take as is: a cookie without whitespace, then the canonical date, then
+    # the rest of the timestamp. Any other row goes through _split_row instead
+    BULK_COOKIE_PATTERN = rb"[^,\s]+"
+    BULK_TIMESTAMP_TAIL_PATTERN = rb"[^,\r\n]*\r?$"
+
     def __init__(self, filename: str, target_date: str):
         """Initialize the processor.
 
@@ -25,7 +46,7 @@ class CookieLogProcessor:
         self.filename = Path(filename)
         self.target_date = target_date
         self.logger.debug(
-            f"Initialized processor for file: {filename}, date: {target_date}"
+            "Initialized processor for file: %s, date: %s", filename, target_date
         )
 
     def process(self) -> List[str]:
@@ -41,67 +62,265 @@ class CookieLogProcessor:
         self.logger.debug("Starting cookie log processing")
 
         try:
-            cookie_counts = self._count_cookies_for_date()
-            most_active = self._find_most_active(cookie_counts)
-
-            self.logger.debug(f"Found {len(most_active)} most active cookie(s)")
+            if self.filename.stat().st_size > self.BULK_COUNT_THRESHOLD:
+                cookie_counts = self._count_cookies_mapped()
+            else:
+                cookie_counts = self._count_cookies_for_date()
+            most_active = [
+                cookie.decode("utf-8")
+                for cookie in self._find_most_active(cookie_counts)
+            ]
+
+            self.logger.debug("Found %d most active cookie(s)", len(most_active))
             return most_active
 
         except Exception as e:
-            self.logger.error(f"Error processing cookie log: {e}")
+            self.logger.error("Error processing cookie log: %s", e)
             raise
 
-    def _read_cookie_log(self) -> Iterator[Tuple[str, str]]:
+    def _read_cookie_log(
+        self, from_date: Optional[str] = None
+    ) -> Iterator[Tuple[bytes, bytes]]:
         """Read and parse the cookie log file.
 
+        The log has a fixed two-column ``cookie,timestamp`` schema, so lines
+        are split on the first comma directly instead of going through the
+        csv module.
+
+        Args:
+            from_date: Optional YYYY-MM-DD date; since the log is sorted by
+                timestamp descending, rows dated after it are skipped by
+                seeking straight to the first row on or before that date
+
         Yields:
-            Tuples of (cookie_name, timestamp_string)
+            Tuples of (cookie_name, timestamp) as undecoded bytes
 
         Raises:
             FileNotFoundError: If the file doesn't exist
-            csv.Error: If the CSV format is invalid
+            ValueError: If the file is empty
         """
-        self.logger.debug(f"Reading cookie log from: {self.filename}")
+        self.logger.debug("Reading cookie log from: %s", self.filename)
 
         try:
-            with open(self.filename, "r", encoding="utf-8") as file:
-                reader = csv.reader(file)
-
-                # Skip header row
-                header = next(reader, None)
-                if header is None:
-                    raise ValueError("Empty file")
-
-                expected_header = ["cookie", "timestamp"]
-                if header != expected_header:
-                    self.logger.warning(
-                        f"Unexpected header: {header}, expected: {expected_header}"
-                    )
+            fd = os.open(self.filename, os.O_RDONLY)
+        except FileNotFoundError:
+            self.logger.error("File not found: %s", self.filename)
+            raise
 
-                line_num = 2  # Start from line 2
-                for row in reader:
-                    if len(row) != 2:
-                        self.logger.warning(
-                            f"Skipping malformed line {line_num}: {row}"
-                        )
-                        line_num += 1
+        try:
+            lines = self._iter_lines(fd)
+
+            # Skip header row
+            header = next(lines, None)
+            if header is None:
+                raise ValueError("Empty file")
+
+            self._check_header(header)
+
+            offset = 0
+            if from_date is not None:
+                offset = self._find_date_offset(fd, from_date.encode("ascii"))
+                if offset:
+                    self.logger.debug("Seeking to offset %d for %s", offset, from_date)
+                    os.lseek(fd, offset, os.SEEK_SET)
+                    lines = self._iter_lines(fd)
+
+            # Line number of the first line read, only worked out after a seek
+            # once a warning needs it, and then reused for the rest of the scan
+            first_line_num = 2 if offset == 0 else None
+
+            skipped_lines = 0
+            for index, line in enumerate(lines):
+                # A well-formed row has a value on either side of its only
+                # comma; anything else goes to the slow path below. strip()
+                # hands back the same object when there is nothing to strip,
+                # which makes it cheaper than checking for padding first
+                i = line.find(b",")
+                if 0 < i < len(line) - 1 and line.find(b",", i + 1) < 0:
+                    cookie = line[:i].strip()
+                    if cookie:
+                        yield cookie, line[i + 1 :]
                         continue
 
-                    cookie, timestamp = row[0].strip(), row[1].strip()
-                    if not cookie or not timestamp:
-                        self.logger.warning(f"Skipping empty values on line {line_num}")
-                        line_num += 1
-                        continue
+                if first_line_num is None:
+                    first_line_num = self._line_number_at(offset)
+                self._warn_malformed_line(line, first_line_num + index)
+                skipped_lines += 1
 
-                    yield cookie, timestamp
-                    line_num += 1
+            if skipped_lines:
+                self.logger.debug("Skipped %d malformed line(s)", skipped_lines)
 
-        except FileNotFoundError:
-            self.logger.error(f"File not found: {self.filename}")
-            raise
-        except csv.Error as e:
-            self.logger.error(f"CSV parsing error: {e}")
-            raise ValueError(f"Invalid CSV format: {e}")
+        finally:
+            os.close(fd)
+
+    def _check_header(self, header: bytes) -> None:
+        """Log a warning if the header row isn't the expected one.
+
+        Args:
+            header: First line of the file, without its line ending
+        """
+        expected_header = b"cookie,timestamp"
+        if header != expected_header:
+            self.logger.warning(
+                "Unexpected header: %r, expected: %r",
+                header.decode("utf-8", "replace"),
+                expected_header.decode("ascii"),
+            )
+
+    def _warn_malformed_line(self, line: bytes, line_num: int) -> None:
+        """Log why a line of the cookie log is being skipped.
+
+        Args:
+            line: Raw line that isn't a well-formed ``cookie,timestamp`` row
+            line_num: Line number of the line in the file
+        """
+        fields = line.split(b",")
+        if len(fields) != 2:
+            self.logger.warning(
+                "Skipping malformed line %d: %r",
+                line_num,
+                line.decode("utf-8", "replace"),
+            )
+        else:
+            self.logger.warning("Skipping empty values on line %d", line_num)
+
+    @staticmethod
+    def _split_row(line: bytes) -> Optional[Tuple[bytes, bytes]]:
+        """Split a line of the cookie log into its cookie and timestamp.
+
+        Args:
+            line: Raw line of the log
+
+        Returns:
+            Tuple of (cookie_name, timestamp) with surrounding whitespace
+            removed, or None if the line isn't a well-formed
+            ``cookie,timestamp`` row
+        """
+        i = line.find(b",")
+        if i < 0 or line.find(b",", i + 1) >= 0:
+            return None
+
+        cookie, timestamp = line[:i].strip(), line[i + 1 :].strip()
+        if not cookie or not timestamp:
+            return None
+        return cookie, timestamp
+
+    @staticmethod
+    def _find_date_offset(fd: int, date: bytes, before: bool = False) -> int:
+        """Binary search a descending log for the first row on or before a date.
+
+        The file is memory-mapped and probed at byte offsets, each probe being
+        aligned to the start of the line it falls in. Rows whose timestamp
+        can't be read never move the result past rows of the date itself:
+        they count as matching when looking for where the date starts, and as
+        not matching when looking for where it ends.
+
+        Args:
+            fd: File descriptor of the log opened for reading
+            date: Date in YYYY-MM-DD format as ASCII bytes
+            before: Look for the first row strictly before the date instead,
+                i.e. the end of the rows on the date
+
+        Returns:
+            Byte offset of the first such row, the file size if there is none,
+            or 0 if the file has no data rows
+        """
+        size = os.fstat(fd).st_size
+        if size == 0:
+            return 0
+
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+            # Invariant: rows starting before lo are dated after the date,
+            # rows starting at or after hi are not
+            lo = mm.find(b"\n") + 1
+            if lo == 0:
+                return 0
+            hi = size
+
+            while lo < hi:
+                mid = (lo + hi) // 2
+                start = max(mm.rfind(b"\n", lo, mid) + 1, lo)
+                end = mm.find(b"\n", start)
+                if end < 0:
+                    end = size
+
+                line = mm[start:end]
+                comma = line.find(b",")
+                entry_date = line[comma + 1 : comma + 11]
+                if comma < 0 or entry_date[4:5] != b"-" or entry_date[7:8] != b"-":
+                    found = not before
+                elif before:
+                    found = entry_date < date
+                else:
+                    found = entry_date <= date
+
+                if found:
+                    hi = start
+                else:
+                    lo = end + 1
+
+        return lo
+
+    def _line_number_at(self, offset: int) -> int:
+        """Work out the line number of the line starting at a byte offset.
+
+        Args:
+            offset: Byte offset of the start of a line
+
+        Returns:
+            1-based line number of that line in the file
+        """
+        newlines = 0
+        with open(self.filename, "rb") as file:
+            remaining = offset
+            while remaining > 0:
+                block = file.read(min(remaining, self.READ_BLOCK_SIZE))
+                if not block:
+                    break
+                newlines += block.count(b"\n")
+                remaining -= len(block)
+
+        return newlines + 1
+
+    @classmethod
+    def _iter_lines(cls, fd: int) -> Iterator[bytes]:
+        """Split the contents of an open file descriptor into lines.
+
+        The file is read in large blocks; a partial line at the end of a block
+        is carried over to the next one. Line endings (LF or CRLF, detected
+        from the first line) are not included in the yielded lines.
+
+        Args:
+            fd: File descriptor opened for reading
+
+        Yields:
+            Raw lines of the file
+        """
+        tail = b""
+        separator = b""
+
+        while True:
+            block = os.read(fd, cls.READ_BLOCK_SIZE)
+            if not block:
+                break
+
+            data = tail + block
+            if not separator:
+                newline = data.find(b"\n")
+                if newline < 0:
+                    tail = data
+                    continue
+                crlf = newline > 0 and data[newline - 1 : newline] == b"\r"
+                separator = b"\r\n" if crlf else b"\n"
+
+            lines = data.split(separator)
+            tail = lines.pop()
+            yield from lines
+
+        if separator == b"\r\n" and tail.endswith(b"\r"):
+            tail = tail[:-1]
+        if tail:
+            yield tail
 
     def _extract_date(self, timestamp_str: str) -> str:
         """Extract date in YYYY-MM-DD format from timestamp.
@@ -113,55 +332,281 @@ class CookieLogProcessor:
         Returns:
             Date string in YYYY-MM-DD format
         """
+        # ISO timestamps start with the date itself, so slice it out directly
+        # and only fall back to full parsing for anything else
+        if (
+            len(timestamp_str) >= 10
+            and timestamp_str[4] == "-"
+            and timestamp_str[7] == "-"
+        ):
+            return timestamp_str[:10]
+
         try:
             dt = datetime.fromisoformat(timestamp_str)
         except ValueError as e:
-            self.logger.warning(f"Invalid timestamp format: {timestamp_str}")
+            self.logger.warning("Invalid timestamp format: %s", timestamp_str)
             raise ValueError(f"Invalid timestamp format: {timestamp_str}") from e
 
         return dt.date().isoformat()
 
-    def _count_cookies_for_date(self) -> Dict[str, int]:
+    def _parse_entry_date(self, timestamp: bytes) -> Optional[bytes]:
+        """Extract the date of a timestamp that failed the fast structural check.
+
+        Args:
+            timestamp: Raw timestamp field of a log row
+
+        Returns:
+            Date in YYYY-MM-DD format as bytes, or None if the timestamp is
+            invalid and the row should be skipped
+        """
+        try:
+            entry_date = self._extract_date(timestamp.decode("utf-8").strip())
+        except ValueError as e:
+            self.logger.warning("Skipping entry with invalid timestamp: %s", e)
+            return None
+
+        return entry_date.encode("ascii")
+
+    def _count_cookies_for_date(self) -> Dict[bytes, int]:
         """Count cookie occurrences for the target date.
 
         Returns:
-            Dictionary mapping cookie names to their occurrence counts
+            Dictionary mapping raw cookie names to their occurrence counts
         """
-        self.logger.debug(f"Counting cookies for date: {self.target_date}")
+        self.logger.debug("Counting cookies for date: %s", self.target_date)
 
-        cookie_counts: Dict[str, int] = defaultdict(int)
-        processed_entries = 0
-        relevant_entries = 0
+        # Counter consumes the matching cookies directly, so the counting
+        # runs in C and the matches are never held in memory
+        cookie_counts = Counter(self._iter_cookies_for_date())
 
-        for cookie, timestamp in self._read_cookie_log():
-            processed_entries += 1
+        self.logger.debug(
+            "Found %d entries for target date", sum(cookie_counts.values())
+        )
+        return cookie_counts
 
-            try:
-                entry_date = self._extract_date(timestamp)
+    def _iter_cookies_for_date(self) -> Iterator[bytes]:
+        """Iterate over the cookies of the rows dated on the target date.
 
-                if entry_date == self.target_date:
-                    cookie_counts[cookie] += 1
-                    relevant_entries += 1
-                    self.logger.debug(f"Found cookie '{cookie}' on target date")
-                elif entry_date < self.target_date:
-                    # Since data is sorted by timestamp descending,
-                    # we can stop when we encounter dates before our target
-                    self.logger.debug(
-                        f"Reached date {entry_date} < {self.target_date}, stopping"
-                    )
-                    break
+        Yields:
+            Raw cookie name of each row on the target date
+        """
+        # Bound once up front, the loops below run for every row in the log
+        target_date = self.target_date.encode("ascii")
+
+        rows = self._read_cookie_log(self.target_date)
+
+        # Since data is sorted by timestamp descending, the target date's
+        # rows form a single block: first skip the rows dated after it...
+        for cookie, timestamp in rows:
+            # Cheap structural check instead of parsing every timestamp
+            if timestamp[4:5] == b"-" and timestamp[7:8] == b"-":
+                entry_date = timestamp[:10]
+            else:
+                parsed_date = self._parse_entry_date(timestamp)
+                if parsed_date is None:
+                    continue
+                entry_date = parsed_date
+
+            if entry_date > target_date:
+                continue
+            if entry_date < target_date:
+                return
+
+            yield cookie
+            break
+
+        # ...then yield rows until the first one with a different date.
+        # Rows starting with the target date are matched by a single prefix
+        # comparison, without slicing out their date first
+        for cookie, timestamp in rows:
+            if timestamp.startswith(target_date):
+                yield cookie
+                continue
 
-            except ValueError as e:
-                self.logger.warning(f"Skipping entry with invalid timestamp: {e}")
+            if timestamp[4:5] == b"-" and timestamp[7:8] == b"-":
+                return
+
+            parsed_date = self._parse_entry_date(timestamp)
+            if parsed_date is None:
                 continue
+            if parsed_date != target_date:
+                return
+            yield cookie
+
+    def _count_cookies_mapped(self) -> Dict[bytes, int]:
+        """Count cookie occurrences for the target date over a memory map.
+
+        Both ends of the target date's block of rows are found by binary
+        search, and the block is then counted by _count_matching without
+        running any Python code per row. The few rows in the block it can't
+        take as is, such as padded or compact ISO timestamps, are parsed
+        like the streaming reader does, and malformed rows are logged with
+        their line numbers.
+
+        Returns:
+            Dictionary mapping raw cookie names to their occurrence counts
+
+        Raises:
+            FileNotFoundError: If the file doesn't exist
+        """
+        self.logger.debug("Counting cookies for date in bulk: %s", self.filename)
+
+        target_date = self.target_date.encode("ascii")
+
+        try:
+            fd = os.open(self.filename, os.O_RDONLY)
+        except FileNotFoundError:
+            self.logger.error("File not found: %s", self.filename)
+            raise
+
+        try:
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+                header_end = mm.find(b"\n")
+                header = mm[:header_end] if header_end >= 0 else mm[:]
+                if header.endswith(b"\r"):
+                    header = header[:-1]
+                self._check_header(header)
+
+                start = self._find_date_offset(fd, target_date)
+                end = self._find_date_offset(fd, target_date, before=True)
+                if start >= end:
+                    return {}
+
+                if end - start > self.PARALLEL_THRESHOLD:
+                    counts, other_lines = self._count_parallel(
+                        mm, target_date, start, end
+                    )
+                else:
+                    counts, other_lines = self._count_matching(
+                        mm, target_date, start, end
+                    )
+
+                # Line numbers are only worked out once a warning needs them,
+                # counting on from the previous malformed line each time
+                line_num = None
+                line_offset = start
+                for offset, line in other_lines:
+                    row = self._split_row(line)
+                    if row is None:
+                        if line_num is None:
+                            line_num = self._line_number_at(start)
+                        line_num += mm[line_offset:offset].count(b"\n")
+                        line_offset = offset
+                        self._warn_malformed_line(line, line_num)
+                    elif self._parse_entry_date(row[1]) == target_date:
+                        counts[row[0]] = counts.get(row[0], 0) + 1
+        finally:
+            os.close(fd)
 
         self.logger.debug(
-            f"Processed {processed_entries} entries, "
-            f"found {relevant_entries} for target date"
+            "Scanned %d bytes, found %d entries for target date",
+            end - start,
+            sum(counts.values()),
         )
-        return cookie_counts
+        return counts
+
+    def _count_parallel(
+        self, mm: mmap.mmap, date: bytes, start: int, end: int
+    ) -> Tuple[Dict[bytes, int], List[Tuple[int, bytes]]]:
+        """Count the cookies of a large block of rows across processes.
+
+        The block is split into one chunk per CPU, each ending on a line
+        boundary, and every worker maps and counts its own chunk.
+
+        Args:
+            mm: Memory-mapped log, used to align the chunk boundaries
+            date: Date in YYYY-MM-DD format as ASCII bytes
+            start: Offset of the first line of the block
+            end: Offset of the end of the block
+
+        Returns:
+            Same as _count_matching, for the whole block
+        """
+        workers = os.cpu_count() or 1
+        step = -(-(end - start) // workers)
+
+        chunk_starts: List[int] = []
+        chunk_ends: List[int] = []
+        chunk_start = start
+        while chunk_start < end:
+            newline = mm.find(b"\n", chunk_start + step, end)
+            chunk_end = end if newline < 0 else newline + 1
+            chunk_starts.append(chunk_start)
+            chunk_ends.append(chunk_end)
+            chunk_start = chunk_end
+
+        self.logger.debug("Counting %d chunks in parallel", len(chunk_starts))
+
+        counts: Counter[bytes] = Counter()
+        other_lines: List[Tuple[int, bytes]] = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for partial_counts, partial_lines in executor.map(
+                self._count_chunk,
+                [str(self.filename)] * len(chunk_starts),
+                [date] * len(chunk_starts),
+                chunk_starts,
+                chunk_ends,
+            ):
+                counts.update(partial_counts)
+                other_lines.extend(partial_lines)
+
+        return counts, other_lines
+
+    @classmethod
+    def _count_chunk(
+        cls, filename: str, date: bytes, start: int, end: int
+    ) -> Tuple[Dict[bytes, int], List[Tuple[int, bytes]]]:
+        """Count the cookies of rows dated on a given date in part of a file.
+
+        Runs in worker processes started by _count_parallel.
+
+        Args:
+            filename: Path to the cookie log CSV file
+            date: Date in YYYY-MM-DD format as ASCII bytes
+            start: Offset of the first line to scan
+            end: Offset to stop scanning at
+
+        Returns:
+            Same as _count_matching, for that part of the file
+        """
+        with open(filename, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return cls._count_matching(mm, date, start, end)
+
+    @classmethod
+    def _count_matching(
+        cls, buf: Union[bytes, mmap.mmap], date: bytes, start: int, end: int
+    ) -> Tuple[Dict[bytes, int], List[Tuple[int, bytes]]]:
+        """Count the cookies of rows dated on a given date within a buffer.
+
+        The rows are matched by a regular expression and counted by Counter,
+        so the whole scan runs in C. Lines that don't have the expected
+        shape are returned for the caller to parse instead.
 
-    def _find_most_active(self, cookie_counts: Dict[str, int]) -> List[str]:
+        Args:
+            buf: Log contents, e.g. a memory-mapped file
+            date: Date in YYYY-MM-DD format as ASCII bytes
+            start: Offset of the first line to scan, at the start of a line
+            end: Offset to stop scanning at
+
+        Returns:
+            Tuple of a dictionary mapping raw cookie names to their occurrence
+            counts, and the offsets and contents of the non-empty lines that
+            weren't counted
+        """
+        cookie = cls.BULK_COOKIE_PATTERN
+        rest = rb"," + re.escape(date) + cls.BULK_TIMESTAMP_TAIL_PATTERN
+        matching = re.compile(rb"^(" + cookie + rb")" + rest, re.MULTILINE)
+        other = re.compile(rb"^(?!" + cookie + rest + rb")[^\n]+", re.MULTILINE)
+
+        return (
+            Counter(matching.findall(buf, start, end)),
+            [(m.start(), m.group()) for m in other.finditer(buf, start, end)],
+        )
+
+    def _find_most_active(
+        self, cookie_counts: Dict[CookieName, int]
+    ) -> List[CookieName]:
         """Find the cookie(s) with the highest count.
 
         Args:
@@ -174,10 +619,17 @@ class CookieLogProcessor:
             self.logger.debug("No cookies found for the target date")
             return []
 
-        max_count = max(cookie_counts.values())
-        most_active = [
-            cookie for cookie, count in cookie_counts.items() if count == max_count
-        ]
-
-        self.logger.debug(f"Most active cookies (count={max_count}): {most_active}")
-        return sorted(most_active)  # Sort for consistent output
+        # Single pass tracking the highest count and the cookies that have it
+        max_count = 0
+        most_active: List[CookieName] = []
+        for cookie, count in cookie_counts.items():
+            if count > max_count:
+                max_count = count
+                most_active = [cookie]
+            elif count == max_count:
+                most_active.append(cookie)
+
+        self.logger.debug("Most active cookies (count=%d): %s", max_count, most_active)
+        if len(most_active) > 1:
+            most_active.sort()  # Sort for consistent output
+        return most_active
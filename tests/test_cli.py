@@ -81,3 +81,40 @@ class TestArgumentParsing:
             assert args.date == "2018-12-09"
         finally:
             Path(filename).unlink()
+
+    def test_parser_is_shared_between_instances(self):
+        """Test the argparse parser is only built once."""
+        assert ArgumentParser().parser is self.parser.parser
+
+    def test_parse_arguments_file_below_file(self):
+        """Test a path going through a regular file is reported as not found."""
+        filename = self.create_test_file()
+
+        try:
+            with pytest.raises(SystemExit) as exc_info:
+                self.parser.parse_arguments(
+                    ["-f", str(Path(filename) / "nested.csv"), "-d", "2018-12-09"]
+                )
+            assert exc_info.value.code == 2
+        finally:
+            Path(filename).unlink()
+
+    def test_parse_arguments_symlink_loop(self, tmp_path):
+        """Test a symlink loop is reported as not found."""
+        loop = tmp_path / "loop.csv"
+        loop.symlink_to(loop)
+
+        with pytest.raises(SystemExit) as exc_info:
+            self.parser.parse_arguments(["-f", str(loop), "-d", "2018-12-09"])
+        assert exc_info.value.code == 2
+
+    def test_parse_arguments_stat_error_propagates(self, monkeypatch):
+        """Test errors other than a missing file aren't reported as usage errors."""
+
+        def deny(path):
+            raise PermissionError(13, "Permission denied", path)
+
+        monkeypatch.setattr("arg_parser.os.stat", deny)
+
+        with pytest.raises(PermissionError):
+            self.parser.parse_arguments(["-f", "cookie_log.csv", "-d", "2018-12-09"])
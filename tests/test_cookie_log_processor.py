@@ -44,6 +44,18 @@ class TestCookieLogProcessor:
 
         assert result == "2018-12-09"
 
+    @pytest.mark.skipif(
+        sys.version_info < (3, 11),
+        reason="fromisoformat only parses basic-format dates from Python 3.11",
+    )
+    def test_extract_date_compact_timestamp(self):
+        """Test the parsing fallback returns the date in YYYY-MM-DD format."""
+        processor = CookieLogProcessor("dummy.csv", "2018-12-09")
+
+        result = processor._extract_date("20181209T14:19:00+00:00")
+
+        assert result == "2018-12-09"
+
     def test_find_most_active_single_winner(self):
         """Test finding most active cookie with single winner."""
         processor = CookieLogProcessor("dummy.csv", "2018-12-09")
@@ -111,3 +123,165 @@ class TestCookieLogProcessorWithFiles:
         result = processor.process()
         # Should process valid lines and ignore malformed ones
         assert result == ["AtY0laUfhglK3lC7"]
+
+    def test_process_crlf_line_endings(self, tmp_path):
+        """Test processing a log written with CRLF line endings."""
+        log_file = tmp_path / "crlf_log.csv"
+        log_file.write_bytes(
+            b"cookie,timestamp\r\n"
+            b"AtY0laUfhglK3lC7,2018-12-09T14:19:00+00:00\r\n"
+            b"SAZuXPGUrfbcn5UA,2018-12-09T10:13:00+00:00\r\n"
+            b"AtY0laUfhglK3lC7,2018-12-09T06:19:00+00:00\r\n"
+            b"SAZuXPGUrfbcn5UA,2018-12-08T22:03:00+00:00"
+        )
+        processor = CookieLogProcessor(str(log_file), "2018-12-08")
+
+        result = processor.process()
+        assert result == ["SAZuXPGUrfbcn5UA"]
+
+    @pytest.mark.parametrize(
+        "log_text, expected",
+        [
+            (
+                (
+                    Path(__file__).parent / "fixtures" / "malformed_missing_fields.csv"
+                ).read_text(),
+                ["AtY0laUfhglK3lC7"],
+            ),
+            (
+                "cookie,timestamp\n"
+                "SAZuXPGUrfbcn5UA,2018-12-09T14:19:00+00:00\n"
+                "AtY0laUfhglK3lC7, 2018-12-09T10:13:00+00:00\n"
+                "AtY0laUfhglK3lC7,\t2018-12-09T07:25:00+00:00\n"
+                "5UAVanZf6UtGyKVS,not-a-timestamp\n"
+                "SAZuXPGUrfbcn5UA,2018-12-08T22:03:00+00:00\n",
+                ["AtY0laUfhglK3lC7"],
+            ),
+            (
+                "cookie,timestamp\n"
+                "AtY0laUfhglK3lC7,2018-12-09T14:19:00+00:00\n"
+                "AtY0laUfhglK3lC7 ,2018-12-09T12:19:00+00:00\n"
+                "SAZuXPGUrfbcn5UA,2018-12-09T10:13:00+00:00\n"
+                "  ,2018-12-09T09:13:00+00:00\n"
+                "  ,2018-12-09T08:13:00+00:00\n"
+                "  ,2018-12-09T07:13:00+00:00\n"
+                "SAZuXPGUrfbcn5UA,2018-12-08T22:03:00+00:00\n",
+                ["AtY0laUfhglK3lC7"],
+            ),
+            (
+                "cookie,timestamp\n"
+                "AtY0laUfhglK3lC7,2018-12-09T14:19:00+00:00,extra\n"
+                "SAZuXPGUrfbcn5UA,2018-12-09T10:13:00+00:00\n"
+                "AtY0laUfhglK3lC7,2018-12-09T07:25:00+00:00,extra\n"
+                "AtY0laUfhglK3lC7,2018-12-09T06:19:00+00:00\n"
+                "SAZuXPGUrfbcn5UA,2018-12-09T05:13:00+00:00\n",
+                ["SAZuXPGUrfbcn5UA"],
+            ),
+        ],
+    )
+    def test_process_bulk_count_matches_streaming(
+        self, tmp_path, monkeypatch, log_text, expected
+    ):
+        """Test that bulk counting agrees with the streaming reader."""
+        log_file = tmp_path / "bulk_log.csv"
+        log_file.write_text(log_text)
+        processor = CookieLogProcessor(str(log_file), "2018-12-09")
+
+        streaming_counts = processor._count_cookies_for_date()
+        monkeypatch.setattr(CookieLogProcessor, "BULK_COUNT_THRESHOLD", 0)
+
+        assert processor._count_cookies_mapped() == streaming_counts
+        assert processor.process() == expected
+
+    def test_process_bulk_count_warnings_match_streaming(
+        self, tmp_path, monkeypatch, caplog
+    ):
+        """Test that bulk counting logs the same warnings as the streaming reader."""
+        log_file = tmp_path / "bulk_warnings_log.csv"
+        log_file.write_text(
+            "cookie,timestamp,extra\n"
+            "AtY0laUfhglK3lC7,2018-12-10T14:19:00+00:00\n"
+            "SAZuXPGUrfbcn5UA,2018-12-09T10:13:00+00:00\n"
+            "malformed-line\n"
+            "5UAVanZf6UtGyKVS,2018-12-09T07:25:00+00:00\n"
+            ",2018-12-09T06:19:00+00:00\n"
+            "AtY0laUfhglK3lC7,not-a-timestamp\n"
+            "AtY0laUfhglK3lC7,2018-12-09T05:19:00+00:00\n"
+            "SAZuXPGUrfbcn5UA,2018-12-08T22:03:00+00:00\n"
+        )
+        processor = CookieLogProcessor(str(log_file), "2018-12-09")
+
+        processor._count_cookies_for_date()
+        streaming_warnings = [r.getMessage() for r in caplog.records]
+        caplog.clear()
+        monkeypatch.setattr(CookieLogProcessor, "BULK_COUNT_THRESHOLD", 0)
+        processor._count_cookies_mapped()
+        bulk_warnings = [r.getMessage() for r in caplog.records]
+
+        assert (
+            "Unexpected header: 'cookie,timestamp,extra', expected: 'cookie,timestamp'"
+            in bulk_warnings
+        )
+        assert "Skipping malformed line 4: 'malformed-line'" in bulk_warnings
+        assert "Skipping empty values on line 6" in bulk_warnings
+        assert sorted(bulk_warnings) == sorted(streaming_warnings)
+
+    def test_read_cookie_log_from_date(self, tmp_path, caplog):
+        """Test seeking to the target date keeps warning line numbers exact."""
+        log_file = tmp_path / "seek_log.csv"
+        log_file.write_text(
+            "cookie,timestamp\n"
+            "AtY0laUfhglK3lC7,2018-12-10T14:19:00+00:00\n"
+            "SAZuXPGUrfbcn5UA,2018-12-10T10:13:00+00:00\n"
+            "5UAVanZf6UtGyKVS,2018-12-09T07:25:00+00:00\n"
+            "malformed-line\n"
+            "AtY0laUfhglK3lC7,2018-12-08T06:19:00+00:00\n"
+        )
+        processor = CookieLogProcessor(str(log_file), "2018-12-09")
+
+        rows = list(processor._read_cookie_log("2018-12-09"))
+
+        assert rows == [
+            (b"5UAVanZf6UtGyKVS", b"2018-12-09T07:25:00+00:00"),
+            (b"AtY0laUfhglK3lC7", b"2018-12-08T06:19:00+00:00"),
+        ]
+        assert "Skipping malformed line 5: 'malformed-line'" in caplog.text
+
+    def test_process_parallel_count_matches_streaming(self, monkeypatch):
+        """Test that counting across processes agrees with the streaming reader."""
+        fixture_path = Path(__file__).parent / "fixtures" / "tie_scenario.csv"
+        processor = CookieLogProcessor(str(fixture_path), "2018-12-09")
+
+        expected = processor._count_cookies_for_date()
+        monkeypatch.setattr(CookieLogProcessor, "BULK_COUNT_THRESHOLD", 0)
+        monkeypatch.setattr(CookieLogProcessor, "PARALLEL_THRESHOLD", 0)
+        # Several chunks, so partial counts of the same cookie get merged
+        monkeypatch.setattr("cookie_log_processor.os.cpu_count", lambda: 4)
+
+        assert processor._count_cookies_mapped() == expected
+
+    def test_read_cookie_log_from_date_multiple_malformed(self, tmp_path, caplog):
+        """Test every malformed row after the seek point gets its line number."""
+        log_file = tmp_path / "seek_malformed_log.csv"
+        log_file.write_text(
+            "cookie,timestamp\n"
+            "AtY0laUfhglK3lC7,2018-12-10T14:19:00+00:00\n"
+            "SAZuXPGUrfbcn5UA,2018-12-09T10:13:00+00:00\n"
+            "malformed-line\n"
+            "5UAVanZf6UtGyKVS,2018-12-09T07:25:00+00:00\n"
+            "another-malformed-line\n"
+            ",2018-12-09T06:19:00+00:00\n"
+            "AtY0laUfhglK3lC7,2018-12-09T05:19:00+00:00\n"
+        )
+        processor = CookieLogProcessor(str(log_file), "2018-12-09")
+
+        rows = list(processor._read_cookie_log("2018-12-09"))
+
+        assert [cookie for cookie, _ in rows] == [
+            b"SAZuXPGUrfbcn5UA",
+            b"5UAVanZf6UtGyKVS",
+            b"AtY0laUfhglK3lC7",
+        ]
+        assert "Skipping malformed line 4" in caplog.text
+        assert "Skipping malformed line 6" in caplog.text
+        assert "Skipping empty values on line 7" in caplog.text
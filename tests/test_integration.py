@@ -73,3 +73,24 @@ class TestCLIIntegration:
 
         assert result.returncode == 2
         assert "Invalid date format" in result.stderr
+
+    def test_main_path_below_file(self):
+        """Test main application with a path that treats a file as a directory."""
+        fixture_path = Path(__file__).parent / "fixtures" / "sample_log.csv"
+
+        result = subprocess.run(
+            [
+                sys.executable,
+                "src/main.py",
+                "-f",
+                str(fixture_path / "nested.csv"),
+                "-d",
+                "2018-12-09",
+            ],
+            cwd=Path(__file__).parent.parent,
+            capture_output=True,
+            text=True,
+        )
+
+        assert result.returncode == 2
+        assert "File not found" in result.stderr